@@ -1,8 +1,28 @@
-from google.cloud import bigquery
-from google.api_core import retry
-from typing import List, Dict, Any, Optional
+from __future__ import annotations
+from typing import TYPE_CHECKING, List, Dict, Any, Iterator, Optional
+import functools
 import logging
-import pandas as pd
+from utils.lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+bigquery = lazy_import("google.cloud.bigquery")
+retry = lazy_import("google.api_core.retry")
+
+
+def _retry_on_transient_error(func):
+    """
+    Retry func on transient Google API errors.
+    
+    Equivalent to decorating with retry.Retry(predicate=retry.if_transient_error),
+    but builds the Retry on call so google.api_core is not imported with this module.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return retry.Retry(predicate=retry.if_transient_error)(func)(*args, **kwargs)
+    return wrapper
+
 
 class BigQueryAdapter:
     def __init__(self, project_id: str, credentials_path: Optional[str] = None):
@@ -25,7 +45,7 @@ class BigQueryAdapter:
         
         self.logger = logging.getLogger(__name__)
 
-    @retry.Retry(predicate=retry.if_transient_error)
+    @_retry_on_transient_error
     def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
         """
         Execute a BigQuery SQL query and return results as a pandas DataFrame
@@ -38,13 +58,7 @@ class BigQueryAdapter:
             pandas DataFrame containing query results
         """
         try:
-            job_config = bigquery.QueryJobConfig()
-            if params:
-                job_config.query_parameters = [
-                    bigquery.ScalarQueryParameter(key, self._get_param_type(value), value)
-                    for key, value in params.items()
-                ]
-
+            job_config = self._build_job_config(params)
             query_job = self.client.query(query, job_config=job_config)
             results = query_job.result()
             
@@ -56,6 +70,37 @@ class BigQueryAdapter:
             self.logger.error(f"Error executing BigQuery query: {str(e)}")
             raise
 
+    def iter_query_chunks(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        chunk_size: int = 100_000
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Execute a BigQuery SQL query and stream the results as pandas DataFrames
+        
+        Unlike execute_query, the result set is never materialized in full: rows
+        are fetched page by page, so memory is bounded by chunk_size.
+        
+        Args:
+            query: SQL query string
+            params: Query parameters for parameterized queries
+            chunk_size: Maximum number of rows per yielded DataFrame
+            
+        Yields:
+            pandas DataFrames with at most chunk_size rows each
+        """
+        try:
+            job_config = self._build_job_config(params)
+            query_job = self.client.query(query, job_config=job_config)
+            results = query_job.result(page_size=chunk_size)
+            
+            yield from results.to_dataframe_iterable()
+            
+        except Exception as e:
+            self.logger.error(f"Error streaming BigQuery query: {str(e)}")
+            raise
+
     def create_table(self, dataset_id: str, table_id: str, schema: List[bigquery.SchemaField]) -> None:
         """
         Create a new BigQuery table
@@ -99,6 +144,24 @@ class BigQueryAdapter:
             self.logger.error(f"Error inserting rows: {str(e)}")
             raise
 
+    def _build_job_config(self, params: Optional[Dict[str, Any]] = None) -> bigquery.QueryJobConfig:
+        """
+        Build a query job config with the given scalar query parameters
+        
+        Args:
+            params: Query parameters for parameterized queries
+            
+        Returns:
+            QueryJobConfig with query_parameters set
+        """
+        job_config = bigquery.QueryJobConfig()
+        if params:
+            job_config.query_parameters = [
+                bigquery.ScalarQueryParameter(key, self._get_param_type(value), value)
+                for key, value in params.items()
+            ]
+        return job_config
+
     @staticmethod
     def _get_param_type(value: Any) -> str:
         """
@@ -1,6 +1,9 @@
-from google.cloud import firestore
-import pandas as pd
+from __future__ import annotations
 from typing import List, Optional
+from utils.lazy_import import lazy_import
+
+firestore = lazy_import("google.cloud.firestore")
+pd = lazy_import("pandas")
 
 class FirestoreAdapter:
     def __init__(self, project_id: Optional[str] = None, database_name: Optional[str] = None):
@@ -64,6 +67,31 @@ class FirestoreAdapter:
             
         return pd.DataFrame(items) if items else pd.DataFrame()
 
+    def get_documents_to_df(self, collection_name: str, document_ids: List[str]) -> pd.DataFrame:
+        """Fetch a batch of documents by ID and convert them to a pandas DataFrame.
+        
+        Uses a single batched read instead of one request per document.
+        Missing documents are skipped.
+        
+        Args:
+            collection_name: Name of the Firestore collection
+            document_ids: IDs of the documents to retrieve
+            
+        Returns:
+            pandas DataFrame containing the existing documents
+        """
+        collection = self.db.collection(collection_name)
+        refs = [collection.document(document_id) for document_id in document_ids]
+        
+        items = []
+        for doc in self.db.get_all(refs):
+            if doc.exists:
+                item = doc.to_dict()
+                item['document_id'] = doc.id
+                items.append(item)
+                
+        return pd.DataFrame(items) if items else pd.DataFrame()
+
     def get_document_as_series(self, collection_name: str, document_id: str) -> pd.Series:
         """Get a single document as a pandas Series.
         
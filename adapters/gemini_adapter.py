@@ -1,9 +1,11 @@
 from typing import List, Optional, Tuple
-import google.generativeai as genai
+from utils.lazy_import import lazy_import
 import json
 import time
 import mimetypes
 
+genai = lazy_import("google.generativeai")
+
 class GeminiAdapter:
     def __init__(
         self,
@@ -39,6 +41,21 @@ class GeminiAdapter:
 
         self.model = genai.GenerativeModel(self.model_name, system_instruction=self.system_prompt)
 
+        # Create generation config with higher token limit
+        audio_gen_config = {
+            "temperature": self.temperature if self.temperature is not None else 0.3,
+            "max_output_tokens": 4096,  # Increased token limit
+            "top_p": 0.95,  # Controls diversity of output
+            "top_k": 40,    # Number of highest probability tokens to consider
+        }
+        
+        # For audio, create a model without system_instruction to avoid conflicts.
+        # Built once here and reused by every generate_with_audio call.
+        self.audio_model = genai.GenerativeModel(
+            self.model_name,
+            generation_config=audio_gen_config,
+        )
+
     def generate(self, prompt: str) -> Tuple[str, dict]:
         """Generate a response from the Gemini model.
         Args:
@@ -54,11 +71,18 @@ class GeminiAdapter:
         )
         return response.text, response.usage_metadata
 
-    def generate_with_audio(self, prompt: str, audio_file_path: str) -> Tuple[str, dict]:
+    def generate_with_audio(
+        self,
+        prompt: str,
+        audio_file_path: str,
+        prepend_system_prompt: bool = True,
+    ) -> Tuple[str, dict]:
         """Generate a response from the Gemini model with audio input.
         Args:
             prompt: Input text prompt
             audio_file_path: Path to the audio file (MP3, WAV, or M4A)
+            prepend_system_prompt: Whether to prepend the system prompt to prompt.
+                Pass False if prompt already contains it (e.g. pre-rendered).
             
         Returns:
             Tuple of (generated text response, usage metadata)
@@ -88,27 +112,13 @@ class GeminiAdapter:
             
             # Combine system prompt with user prompt if system prompt exists
             full_prompt = prompt
-            if self.system_prompt:
+            if self.system_prompt and prepend_system_prompt:
                 full_prompt = f"{self.system_prompt}\n\n{prompt}"
             
-            # Create generation config with higher token limit
-            audio_gen_config = {
-                "temperature": self.temperature if self.temperature is not None else 0.3,
-                "max_output_tokens": 4096,  # Increased token limit
-                "top_p": 0.95,  # Controls diversity of output
-                "top_k": 40,    # Number of highest probability tokens to consider
-            }
-            
-            # For audio, create a model without system_instruction to avoid conflicts
-            audio_model = genai.GenerativeModel(
-                self.model_name,
-                generation_config=audio_gen_config,
-            )
-            
             print(f"Generating content with model: {self.model_name}")
             
             # Generate content with inline audio data
-            response = audio_model.generate_content(
+            response = self.audio_model.generate_content(
                 [
                     full_prompt,
                     {
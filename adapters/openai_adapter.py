@@ -1,5 +1,7 @@
-import openai
 from typing import List, Dict 
+from utils.lazy_import import lazy_import
+
+openai = lazy_import("openai")
 
 class OpenAIAdapter:
     def __init__(self, api_key: str):
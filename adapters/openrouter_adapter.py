@@ -1,6 +1,8 @@
 import json
-import requests
 from typing import Dict, List, Optional
+from utils.lazy_import import lazy_import
+
+requests = lazy_import("requests")
 
 class OpenRouterAdapter:
     def __init__(self, api_key: str):
@@ -1,7 +1,11 @@
-import gradio as gr
 from adapters.gemini_adapter import GeminiAdapter
-from credentials import GEMINI_API_KEY
 from logging import basicConfig, getLogger
+from prompts.prompt_registry import PromptRegistry, RenderedPrompts
+from typing import Dict, Optional, Tuple
+from utils.admission_control import AdmissionController, AdmissionRejected
+import hashlib
+import os
+import threading
 
 basicConfig(level="INFO", format="%(levelname)s - %(message)s")
 logger = getLogger(__name__)
@@ -17,37 +21,77 @@ LANGUAGES = [
     "Turkish"
 ]
 
-def get_system_prompt(language: str) -> str:
-    """Generate system prompt for a specific target language."""
-    return f"""You are an expert language assessment evaluator. Your task is to:
+# Prompts are rendered once per language at startup; the registry version
+# is a hash of the templates and is attached to cached models, logs and results
+PROMPT_REGISTRY = PromptRegistry(LANGUAGES)
+
+# Admission control in front of analyze_audio_response: bounds concurrent Gemini
+# calls, shares them fairly between clients and sheds load when the queue is full
+ADMISSION_CONTROLLER = AdmissionController(
+    max_concurrency=8,
+    per_client_concurrency=2,
+    max_queue_depth=32,
+    max_client_queue_depth=8,
+    max_queue_wait=120.0,
+    client_weights={},  # e.g. {"key:<hash>": 0.25} to deprioritize a batch API key
+)
 
-1. Listen to the audio response provided by the speaker speaking in {language}. 
-2. Analyze the speaker's {language} language proficiency level based on:
-   - Pronunciation and clarity
-   - Grammar and sentence structure
-   - Vocabulary usage and range
-   - Fluency and coherence
-   - Overall communication effectiveness
+def _hash_api_key(api_key: str) -> str:
+    # Hash keys so raw API keys never end up in logs or metrics
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
 
-3. Output a lower and upper bound for the speaker's proficiency level (CEFR) based on the analysis.
+# Only API keys listed here (comma-separated) get their own admission-control tenant;
+# requests with any other key are bucketed by host, so random keys cannot bypass limits
+KNOWN_API_KEY_HASHES = {
+    _hash_api_key(key.strip()) for key in os.environ.get("ADMISSION_API_KEYS", "").split(",") if key.strip()
+}
 
-4. Determine if the speaker's response actually answers the question that was asked
+# Number of trusted reverse proxies (e.g. 1 on Cloud Run or Spaces) in front of the app.
+# If set, the client host is taken from X-Forwarded-For instead of the socket peer.
+TRUSTED_PROXY_HOPS = int(os.environ.get("TRUSTED_PROXY_HOPS", "0"))
 
-5. Provide your assessment in the following format:
-   
-   **Lower bound for proficiency level (CEFR):**[A1(beginner)/A2(elementary)/B1(intermediate)/B2(upper intermediate)/C1(advanced)/C2(mastery)]
+# Gemini adapters keyed by (prompt version, language), reused across requests
+_gemini_adapters: Dict[Tuple[str, str], GeminiAdapter] = {}
+_gemini_adapters_lock = threading.Lock()
+
+def get_system_prompt(language: str) -> str:
+    """Get the pre-rendered system prompt for a specific target language."""
+    return PROMPT_REGISTRY.get(language).system_prompt
+
+def get_gemini_adapter(prompts: RenderedPrompts) -> GeminiAdapter:
+    """Get the cached Gemini adapter for a prompt version and language, creating it on first use."""
+    key = (prompts.version, prompts.language)
+    adapter = _gemini_adapters.get(key)
+    if adapter is not None:
+        return adapter
+    
+    # Only one thread builds each adapter; construction calls the global genai.configure
+    with _gemini_adapters_lock:
+        if key not in _gemini_adapters:
+            # Read the key on first use so importing this module does not require credentials
+            from credentials import GEMINI_API_KEY
+            _gemini_adapters[key] = GeminiAdapter(
+                api_key=GEMINI_API_KEY,
+                model_name="gemini-2.5-flash",
+                system_prompt=prompts.system_prompt,
+                temperature=0.3,  # Lower temperature for more consistent assessments
+                max_tokens=2048
+            )
+        return _gemini_adapters[key]
 
-   **Upper bound for proficiency level (CEFR):**[A1(beginner)/A2(elementary)/B1(intermediate)/B2(upper intermediate)/C1(advanced)/C2(mastery)]
-   
-   **Detailed Analysis:**
-   - Pronunciation: [Your assessment]
-   - Grammar: [Your assessment]
-   - Vocabulary: [Your assessment]
-   - Fluency: [Your assessment]
-   - Content Relevance: [Your assessment]
+def get_prompt_version() -> Dict[str, object]:
+    """Prompt version and languages served, for API clients to store alongside results."""
+    return {"prompt_version": PROMPT_REGISTRY.version, "languages": PROMPT_REGISTRY.languages}
 
-Be specific, constructive, concise and objective in your assessment.
-"""
+def validate_request(question: str, audio_file, target_language: str) -> Optional[str]:
+    """Check the inputs of analyze_audio_response, returning an error message if invalid."""
+    if not question or not question.strip():
+        return "⚠️ **Error:** Please provide a question."
+    if audio_file is None:
+        return "⚠️ **Error:** Please upload an audio file."
+    if target_language not in PROMPT_REGISTRY:
+        return f"⚠️ **Error:** Unsupported language: {target_language}"
+    return None
 
 def analyze_audio_response(question: str, audio_file, target_language: str) -> str:
     """
@@ -61,39 +105,21 @@ def analyze_audio_response(question: str, audio_file, target_language: str) -> s
     Returns:
         Analysis results as formatted text
     """
-    if not question or not question.strip():
-        return "⚠️ **Error:** Please provide a question."
-    if audio_file is None:
-        return "⚠️ **Error:** Please upload an audio file."
+    validation_error = validate_request(question, audio_file, target_language)
+    if validation_error:
+        return validation_error
     
     try:
-        # Generate system prompt with target language
-        system_prompt = get_system_prompt(target_language)
-        
-        # Initialize Gemini adapter with system prompt
-        gemini = GeminiAdapter(
-            api_key=GEMINI_API_KEY,
-            model_name="gemini-2.5-flash",
-            system_prompt=system_prompt,
-            temperature=0.3,  # Lower temperature for more consistent assessments
-            max_tokens=2048
-        )
-        analysis_prompt = f"""
-Please analyze the {target_language} audio response to the following question:
-
-**Question:** {question}
-
-**Target Language:** {target_language}
-
-Listen to the audio carefully and provide a comprehensive assessment of the speaker's {target_language} language proficiency and whether they adequately answered the question.
-"""
+        prompts = PROMPT_REGISTRY.get(target_language)
+        gemini = get_gemini_adapter(prompts)
         
         # Generate analysis with audio
         result, metadata = gemini.generate_with_audio(
-            prompt=analysis_prompt,
-            audio_file_path=audio_file
+            prompt=prompts.audio_prompt(question),
+            audio_file_path=audio_file,
+            prepend_system_prompt=False
         )
-        logger.info(f"Received result: {result}")
+        logger.info(f"Received result (prompt_version={prompts.version}, language={target_language}): {result}")
         
         return result
         
@@ -108,82 +134,179 @@ Listen to the audio carefully and provide a comprehensive assessment of the spea
         else:
             return f"⚠️ **Error occurred during analysis:**\n\n{error_msg}\n\nPlease check your API key and audio file format."
 
-# Create Gradio interface
-with gr.Blocks(title="Language Proficiency Estimator", theme=gr.themes.Soft()) as demo:
-    gr.Markdown(
-        """
-        # 🎙️ Language Proficiency Estimator
+def get_client_host(peer_host: Optional[str], forwarded_for: Optional[str]) -> Optional[str]:
+    """
+    Determine the client host, honouring X-Forwarded-For only from trusted proxies.
+    
+    Each trusted proxy appends the address it received the request from, so the
+    client is the entry TRUSTED_PROXY_HOPS from the end; anything before it is
+    client-controlled and ignored.
+    """
+    if TRUSTED_PROXY_HOPS <= 0 or not forwarded_for:
+        return peer_host
+    hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+    if not hops:
+        return peer_host
+    return hops[-TRUSTED_PROXY_HOPS] if len(hops) >= TRUSTED_PROXY_HOPS else hops[0]
+
+def get_client_id(api_key: Optional[str], client_host: Optional[str]) -> str:
+    """Identify the client for admission control by known API key, otherwise by host."""
+    if api_key:
+        key_hash = _hash_api_key(api_key)
+        if key_hash in KNOWN_API_KEY_HASHES:
+            return f"key:{key_hash}"
+    return f"host:{client_host}" if client_host else "anonymous"
+
+def admitted_analyze_audio_response(question: str, audio_file, target_language: str, client_id: str) -> str:
+    """
+    Run analyze_audio_response under admission control.
+    
+    Args:
+        question: The question that was asked
+        audio_file: The audio file path from Gradio
+        target_language: The language to assess proficiency in
+        client_id: Client identifier from get_client_id
+        
+    Returns:
+        Analysis results as formatted text, or a 429-style error if the request was shed
+    """
+    # Reject invalid requests before they take up a slot or queue position
+    validation_error = validate_request(question, audio_file, target_language)
+    if validation_error:
+        return validation_error
+    
+    try:
+        with ADMISSION_CONTROLLER.admit(client_id) as queue_wait:
+            logger.info(f"Admitted request (client={client_id}, queue_wait_ms={queue_wait * 1000:.0f})")
+            return analyze_audio_response(question, audio_file, target_language)
+    except AdmissionRejected as e:
+        return f"⚠️ **Too Many Requests (429):**\n\nThe service is busy ({e.reason}).\n\nPlease try again in a moment."
+
+def build_demo():
+    """Create the Gradio interface.
+    
+    Gradio is imported here rather than at module level so that importing
+    this module (e.g. for analyze_audio_response in workers) stays fast.
+    """
+    import gradio as gr
+
+    with gr.Blocks(title="Language Proficiency Estimator", theme=gr.themes.Soft()) as demo:
+        gr.Markdown(
+            """
+            # 🎙️ Language Proficiency Estimator
         
-        Upload an audio response (MP3, WAV, or M4A) and receive an AI-powered assessment of language proficiency 
-        and content relevance using Google's Gemini model.
-        """
-    )
+            Upload an audio response (MP3, WAV, or M4A) and receive an AI-powered assessment of language proficiency 
+            and content relevance using Google's Gemini model.
+            """
+        )
     
-    with gr.Row():
-        with gr.Column(scale=1):
-            gr.Markdown("### 📝 Input")
+        with gr.Row():
+            with gr.Column(scale=1):
+                gr.Markdown("### 📝 Input")
             
-            language_dropdown = gr.Dropdown(
-                choices=LANGUAGES,
-                value="Swedish",
-                label="Target Language",
-                info="Select the language to assess proficiency in"
-            )
+                language_dropdown = gr.Dropdown(
+                    choices=LANGUAGES,
+                    value="Swedish",
+                    label="Target Language",
+                    info="Select the language to assess proficiency in"
+                )
             
-            question_input = gr.Textbox(
-                label="Question",
-                placeholder="Enter the question that was asked...",
-                lines=3,
-                info="What question should the speaker be answering?"
-            )
+                question_input = gr.Textbox(
+                    label="Question",
+                    placeholder="Enter the question that was asked...",
+                    lines=3,
+                    info="What question should the speaker be answering?"
+                )
             
-            audio_input = gr.Audio(
-                label="Audio Response",
-                type="filepath",
-                sources=["upload", "microphone"]
-            )
+                audio_input = gr.Audio(
+                    label="Audio Response",
+                    type="filepath",
+                    sources=["upload", "microphone"]
+                )
             
-            analyze_btn = gr.Button("🔍 Analyze Response", variant="primary", size="lg")
+                analyze_btn = gr.Button("🔍 Analyze Response", variant="primary", size="lg")
             
-            gr.Markdown(
-                """
-                ### ℹ️ Tips
-                - Provide a clear question for context
-                - Ensure audio quality is good
-                - Supported formats: MP3, WAV, M4A
-                """
-            )
+                gr.Markdown(
+                    """
+                    ### ℹ️ Tips
+                    - Provide a clear question for context
+                    - Ensure audio quality is good
+                    - Supported formats: MP3, WAV, M4A
+                    """
+                )
         
-        with gr.Column(scale=1):
-            gr.Markdown("### 📊 Analysis Results")
-            output = gr.Markdown(
-                label="Assessment",
-                value="*Results will appear here after analysis...*"
-            )
+            with gr.Column(scale=1):
+                gr.Markdown("### 📊 Analysis Results")
+                output = gr.Markdown(
+                    label="Assessment",
+                    value="*Results will appear here after analysis...*"
+                )
     
-    # Examples section
-    gr.Markdown("### 💡 Example Questions")
-    gr.Examples(
-        examples=[
-            ["Tell me about your favorite hobby and why you enjoy it."],
-            ["Describe your last vacation. Where did you go and what did you do?"],
-            ["What are your career goals for the next five years?"],
-            ["Explain how climate change affects our daily lives."],
-        ],
-        inputs=question_input,
-        label="Click to use example questions"
-    )
+        # Examples section
+        gr.Markdown("### 💡 Example Questions")
+        gr.Examples(
+            examples=[
+                ["Tell me about your favorite hobby and why you enjoy it."],
+                ["Describe your last vacation. Where did you go and what did you do?"],
+                ["What are your career goals for the next five years?"],
+                ["Explain how climate change affects our daily lives."],
+            ],
+            inputs=question_input,
+            label="Click to use example questions"
+        )
     
-    # Connect the button to the function
-    analyze_btn.click(
-        fn=analyze_audio_response,
-        inputs=[question_input, audio_input, language_dropdown],
-        outputs=output
-    )
+        def handle_analyze(question: str, audio_file, target_language: str, request: gr.Request) -> str:
+            peer_host = request.client.host if request and request.client else None
+            forwarded_for = request.headers.get("x-forwarded-for") if request else None
+            api_key = request.headers.get("x-api-key") if request else None
+            client_id = get_client_id(api_key, get_client_host(peer_host, forwarded_for))
+            return admitted_analyze_audio_response(question, audio_file, target_language, client_id)
+        
+        # Connect the button to the function. Gradio's own per-event limit is
+        # lifted so that ADMISSION_CONTROLLER decides what runs and what waits.
+        analyze_btn.click(
+            fn=handle_analyze,
+            inputs=[question_input, audio_input, language_dropdown],
+            outputs=output,
+            api_name="analyze_audio_response",
+            concurrency_limit=None
+        )
+        
+        # Queue depth and queue wait time, e.g. for scraping via the /metrics API endpoint
+        metrics_btn = gr.Button(visible=False)
+        metrics_output = gr.JSON(visible=False)
+        metrics_btn.click(
+            fn=ADMISSION_CONTROLLER.metrics,
+            outputs=metrics_output,
+            api_name="metrics",
+            concurrency_limit=None
+        )
+        
+        # Version of the prompts used for every assessment, via the /prompt_version API endpoint
+        prompt_version_btn = gr.Button(visible=False)
+        prompt_version_output = gr.JSON(visible=False)
+        prompt_version_btn.click(
+            fn=get_prompt_version,
+            outputs=prompt_version_output,
+            api_name="prompt_version",
+            concurrency_limit=None
+        )
+
+    return demo
+
+def __getattr__(name: str):
+    """Build the Gradio demo on first access to `app.demo` (used by `gradio app.py` reload mode)."""
+    if name == "demo":
+        global demo
+        demo = build_demo()
+        return demo
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def launch_app():
     """Launch the Gradio application."""
-    demo.launch(share=False, server_name="0.0.0.0", server_port=7860)
+    # Enough worker threads for every running and queued request plus the metrics endpoint
+    max_threads = ADMISSION_CONTROLLER.max_concurrency + ADMISSION_CONTROLLER.max_queue_depth + 1
+    build_demo().launch(share=False, server_name="0.0.0.0", server_port=7860, max_threads=max_threads)
 
 if __name__ == "__main__":
     launch_app()
@@ -0,0 +1,115 @@
+"""
+Startup-time benchmark for the app, adapters and utils.
+
+Imports each module in a fresh interpreter with `python -X importtime` and
+checks the cumulative import time against the budgets in import_budget.json.
+It also fails if importing a module pulls in one of the heavy SDKs listed as
+forbidden, since those should only be loaded on first use.
+
+Usage:
+    python benchmarks/import_time.py [--repeat N] [--budget PATH]
+"""
+from pathlib import Path
+from statistics import median
+from typing import Dict, List, Tuple
+import argparse
+import json
+import subprocess
+import sys
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET_PATH = Path(__file__).resolve().parent / "import_budget.json"
+
+
+def measure_import(module: str) -> Tuple[int, List[str]]:
+    """
+    Import a module in a fresh interpreter and parse the -X importtime report.
+
+    Args:
+        module: Fully qualified module name
+
+    Returns:
+        Tuple of (cumulative import time of the module in microseconds,
+        names of all modules imported along the way)
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr}")
+
+    cumulative_us = None
+    imported = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        imported.append(name)
+        if name == module:
+            cumulative_us = int(cumulative)
+
+    if cumulative_us is None:
+        raise RuntimeError(f"No import time reported for {module}")
+    return cumulative_us, imported
+
+
+def check_budgets(budgets_ms: Dict[str, float], forbidden_modules: List[str], repeat: int) -> bool:
+    """
+    Measure every module in budgets_ms and print a report.
+
+    Args:
+        budgets_ms: Mapping of module name to import time budget in milliseconds
+        forbidden_modules: Modules (and their submodules) that must not be imported
+        repeat: Number of fresh-interpreter runs per module; the median is reported
+
+    Returns:
+        True if all modules are within budget and import no forbidden modules
+    """
+    ok = True
+    print(f"{'module':<32} {'median ms':>10} {'budget ms':>10}  status")
+    for module, budget_ms in budgets_ms.items():
+        timings_us = []
+        try:
+            for _ in range(repeat):
+                cumulative_us, imported = measure_import(module)
+                timings_us.append(cumulative_us)
+        except RuntimeError as e:
+            error = str(e).strip().splitlines()[-1]
+            print(f"{module:<32} {'-':>10} {budget_ms:>10.1f}  IMPORT FAILED: {error}")
+            ok = False
+            continue
+
+        elapsed_ms = median(timings_us) / 1000
+        leaked = sorted({
+            forbidden for forbidden in forbidden_modules
+            if any(name == forbidden or name.startswith(forbidden + ".") for name in imported)
+        })
+
+        status = "ok"
+        if elapsed_ms > budget_ms:
+            status = "OVER BUDGET"
+        if leaked:
+            status = f"IMPORTS {', '.join(leaked)}"
+        ok = ok and status == "ok"
+
+        print(f"{module:<32} {elapsed_ms:>10.1f} {budget_ms:>10.1f}  {status}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check module import times against a budget.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh-interpreter runs per module")
+    parser.add_argument("--budget", type=Path, default=DEFAULT_BUDGET_PATH, help="Path to the budget JSON file")
+    args = parser.parse_args()
+
+    budget = json.loads(args.budget.read_text())
+    ok = check_budgets(budget["budgets_ms"], budget.get("forbidden_modules", []), args.repeat)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+import logging
+import numpy as np
+import pandas as pd
+from adapters.firestore_adapter import FirestoreAdapter
+
+logger = logging.getLogger(__name__)
+
+# Ordered CEFR scale; a level's index is its ordinal code
+CEFR_LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
+N_LEVELS = len(CEFR_LEVELS)
+
+
+def parse_cefr_levels(values: pd.Series) -> np.ndarray:
+    """Convert CEFR levels to ordinal codes.
+
+    Accepts labels as produced by the model or a self-assessment form, e.g.
+    "B1", "b2", "C1(advanced)" or "**B2**", as well as integer codes 0-5.
+
+    Args:
+        values: Series of CEFR labels or integer codes
+
+    Returns:
+        int64 array of codes in [0, 5], with -1 for missing, unparsable or non-integer values
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        codes = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = np.isfinite(codes) & (codes >= 0) & (codes < N_LEVELS) & (codes == np.floor(codes))
+        return np.where(valid, codes, -1).astype(np.int64)
+
+    extracted = values.astype("string").str.upper().str.extract(r"([ABC][12])", expand=False)
+    return pd.Categorical(extracted, categories=CEFR_LEVELS).codes.astype(np.int64)
+
+
+def quadratic_weighted_kappa(confusion: np.ndarray) -> float:
+    """Quadratic weighted Cohen's kappa computed from a confusion matrix.
+
+    Equivalent to sklearn.metrics.cohen_kappa_score(..., weights="quadratic",
+    labels=range(6)) on the ordinal codes, but works on accumulated counts so it
+    can be computed over streamed data. Weights are always based on the full
+    CEFR scale; without labels=..., sklearn weights by the index among the
+    levels present, which differs when some levels never occur.
+
+    Args:
+        confusion: Square matrix with labels on rows and predictions on columns
+
+    Returns:
+        Kappa score, or NaN if it is undefined (no rows or a single class)
+    """
+    total = confusion.sum()
+    if total == 0:
+        return float("nan")
+
+    levels = np.arange(confusion.shape[0])
+    weights = (levels[:, None] - levels[None, :]) ** 2
+    expected = np.outer(confusion.sum(axis=1), confusion.sum(axis=0)) / total
+
+    expected_disagreement = (weights * expected).sum()
+    if expected_disagreement == 0:
+        return float("nan")
+    return float(1.0 - (weights * confusion).sum() / expected_disagreement)
+
+
+def exact_accuracy(confusion: np.ndarray) -> float:
+    """Share of rows where the predicted level equals the label."""
+    total = confusion.sum()
+    return float(np.trace(confusion) / total) if total else float("nan")
+
+
+def within_one_accuracy(confusion: np.ndarray) -> float:
+    """Share of rows where the predicted level is at most one level from the label."""
+    total = confusion.sum()
+    if total == 0:
+        return float("nan")
+    levels = np.arange(confusion.shape[0])
+    adjacent = np.abs(levels[:, None] - levels[None, :]) <= 1
+    return float(confusion[adjacent].sum() / total)
+
+
+def mean_level_difference(confusion: np.ndarray) -> float:
+    """Mean of (predicted - label) in CEFR levels; positive means the model rates higher."""
+    total = confusion.sum()
+    if total == 0:
+        return float("nan")
+    levels = np.arange(confusion.shape[0])
+    difference = levels[None, :] - levels[:, None]
+    return float((difference * confusion).sum() / total)
+
+
+@dataclass
+class EvaluationReport:
+    """Accumulated confusion matrices and the agreement metrics derived from them.
+
+    Confusion matrices have self-assessed levels on rows and predicted
+    levels on columns, both ordered as CEFR_LEVELS.
+    """
+    confusion_matrix: np.ndarray
+    by_language: Dict[str, np.ndarray] = field(default_factory=dict)
+    by_prompt_version: Dict[str, np.ndarray] = field(default_factory=dict)
+    n_rows: int = 0
+    n_skipped: int = 0
+
+    @staticmethod
+    def _metrics(confusion: np.ndarray) -> Dict[str, float]:
+        return {
+            "n": int(confusion.sum()),
+            "accuracy": exact_accuracy(confusion),
+            "within_one_accuracy": within_one_accuracy(confusion),
+            "quadratic_weighted_kappa": quadratic_weighted_kappa(confusion),
+            "mean_level_difference": mean_level_difference(confusion),
+        }
+
+    def summary(self, by: str = "language") -> pd.DataFrame:
+        """Metrics overall and per group as a DataFrame indexed by group.
+
+        Args:
+            by: Breakdown to report, either "language" or "prompt_version"
+
+        Returns:
+            pandas DataFrame with one row for "overall" followed by one row per group
+        """
+        if by == "language":
+            groups = self.by_language
+        elif by == "prompt_version":
+            groups = self.by_prompt_version
+        else:
+            raise ValueError(f"Unsupported breakdown: {by}")
+
+        rows = {"overall": self._metrics(self.confusion_matrix)}
+        for group in sorted(groups):
+            rows[group] = self._metrics(groups[group])
+        return pd.DataFrame.from_dict(rows, orient="index")
+
+    def confusion_frame(self, language: Optional[str] = None) -> pd.DataFrame:
+        """Labelled confusion matrix, overall or for a single language.
+
+        Args:
+            language: Optional language to restrict to. If None, returns the overall matrix.
+
+        Returns:
+            pandas DataFrame with self-assessed levels as index and predicted levels as columns
+        """
+        confusion = self.confusion_matrix if language is None else self.by_language[language]
+        return pd.DataFrame(
+            confusion,
+            index=pd.Index(CEFR_LEVELS, name="self_assessed"),
+            columns=pd.Index(CEFR_LEVELS, name="predicted"),
+        )
+
+
+class CEFREvaluator:
+    def __init__(
+        self,
+        prediction_column: str = "predicted_level",
+        label_column: str = "self_assessed_level",
+        language_column: str = "language",
+        prompt_version_column: Optional[str] = None,
+    ):
+        """Streaming evaluator comparing model CEFR predictions with self-assessments.
+
+        Chunks are reduced to per-language (and per-prompt-version) confusion
+        matrices as they arrive, so memory usage does not grow with the number of rows.
+
+        Args:
+            prediction_column: Column holding the model's predicted CEFR level
+            label_column: Column holding the candidate's self-assessed CEFR level
+            language_column: Column holding the assessed language
+            prompt_version_column: Optional column holding the prompt version
+                (see prompts.prompt_registry) that produced each prediction.
+                If set, the report is also broken down by prompt version.
+        """
+        self.prediction_column = prediction_column
+        self.label_column = label_column
+        self.language_column = language_column
+        self.prompt_version_column = prompt_version_column
+
+        # Confusion matrices keyed by (prompt version, language)
+        self._by_group: Dict[Tuple[Optional[str], str], np.ndarray] = {}
+        self.n_rows = 0
+        self.n_skipped = 0
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add a chunk of joined predictions and labels to the running totals.
+
+        Rows with a missing or unparsable level on either side are counted as skipped.
+
+        Args:
+            chunk: DataFrame with the prediction, label and language columns
+        """
+        predicted = parse_cefr_levels(chunk[self.prediction_column])
+        actual = parse_cefr_levels(chunk[self.label_column])
+        valid = (predicted >= 0) & (actual >= 0)
+
+        self.n_rows += len(chunk)
+        self.n_skipped += int(len(chunk) - valid.sum())
+        if not valid.any():
+            return
+
+        languages = chunk[self.language_column].fillna("unknown").to_numpy()[valid]
+        language_codes, language_names = pd.factorize(languages)
+        if self.prompt_version_column:
+            versions = chunk[self.prompt_version_column].fillna("unknown").to_numpy()[valid]
+            version_codes, version_names = pd.factorize(versions)
+        else:
+            version_codes, version_names = np.zeros(len(languages), dtype=np.int64), [None]
+
+        # One bincount over (group, label, prediction) fills every matrix at once
+        group_codes = version_codes * len(language_names) + language_codes
+        n_groups = len(version_names) * len(language_names)
+        flat_index = (group_codes * N_LEVELS + actual[valid]) * N_LEVELS + predicted[valid]
+        counts = np.bincount(flat_index, minlength=n_groups * N_LEVELS * N_LEVELS)
+        counts = counts.reshape(len(version_names), len(language_names), N_LEVELS, N_LEVELS)
+
+        for version_code, language_code in zip(*np.nonzero(counts.sum(axis=(2, 3)))):
+            key = (version_names[version_code], language_names[language_code])
+            confusion = counts[version_code, language_code]
+            if key in self._by_group:
+                self._by_group[key] += confusion
+            else:
+                self._by_group[key] = confusion
+
+    def evaluate(self, chunks: Iterable[pd.DataFrame]) -> EvaluationReport:
+        """Consume an iterable of chunks and return the resulting report.
+
+        Args:
+            chunks: Iterable of DataFrames, e.g. from BigQueryAdapter.iter_query_chunks
+
+        Returns:
+            EvaluationReport over all rows seen so far
+        """
+        for i, chunk in enumerate(chunks):
+            self.update(chunk)
+            logger.info(f"Evaluated chunk {i + 1} ({self.n_rows} rows, {self.n_skipped} skipped)")
+        return self.report()
+
+    def report(self) -> EvaluationReport:
+        """Build a report from the rows seen so far."""
+        overall = np.zeros((N_LEVELS, N_LEVELS), dtype=np.int64)
+        by_language: Dict[str, np.ndarray] = {}
+        by_prompt_version: Dict[str, np.ndarray] = {}
+        for (version, language), confusion in self._by_group.items():
+            overall += confusion
+            by_language[language] = by_language.get(language, 0) + confusion
+            if version is not None:
+                by_prompt_version[version] = by_prompt_version.get(version, 0) + confusion
+
+        return EvaluationReport(
+            confusion_matrix=overall,
+            by_language=by_language,
+            by_prompt_version=by_prompt_version,
+            n_rows=self.n_rows,
+            n_skipped=self.n_skipped,
+        )
+
+
+def join_firestore_labels(
+    prediction_chunks: Iterable[pd.DataFrame],
+    firestore_adapter: FirestoreAdapter,
+    collection_name: str,
+    key_column: str = "candidate_id",
+    label_column: str = "self_assessed_level",
+    lookup_batch_size: int = 500,
+) -> Iterator[pd.DataFrame]:
+    """Join streamed predictions with self-assessment labels stored in Firestore.
+
+    Labels are looked up by document ID for the keys in each chunk only, so
+    the label collection is never loaded in full. Predictions without a
+    label are dropped.
+
+    Args:
+        prediction_chunks: Iterable of prediction DataFrames containing key_column
+        firestore_adapter: Adapter for the database holding the labels
+        collection_name: Collection whose document IDs match key_column
+        key_column: Column in the predictions holding the label document ID
+        label_column: Field in the label documents holding the self-assessed level
+        lookup_batch_size: Maximum number of documents fetched per batched read
+
+    Yields:
+        Prediction chunks with label_column added
+    """
+    for chunk in prediction_chunks:
+        chunk = chunk.assign(**{key_column: chunk[key_column].astype("string")})
+        keys = chunk[key_column].dropna().unique().tolist()
+
+        label_frames = [
+            firestore_adapter.get_documents_to_df(collection_name, keys[start:start + lookup_batch_size])
+            for start in range(0, len(keys), lookup_batch_size)
+        ]
+        label_frames = [frame for frame in label_frames if label_column in frame.columns]
+        if not label_frames:
+            continue
+
+        labels = pd.concat(label_frames, ignore_index=True)[["document_id", label_column]]
+        labels = labels.rename(columns={"document_id": key_column}).astype({key_column: "string"})
+
+        yield chunk.drop(columns=[label_column], errors="ignore").merge(labels, on=key_column, how="inner")
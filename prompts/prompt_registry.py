@@ -0,0 +1,141 @@
+from dataclasses import dataclass
+from typing import Dict, List
+import hashlib
+
+SYSTEM_PROMPT_TEMPLATE = """You are an expert language assessment evaluator. Your task is to:
+
+1. Listen to the audio response provided by the speaker speaking in {language}. 
+2. Analyze the speaker's {language} language proficiency level based on:
+   - Pronunciation and clarity
+   - Grammar and sentence structure
+   - Vocabulary usage and range
+   - Fluency and coherence
+   - Overall communication effectiveness
+
+3. Output a lower and upper bound for the speaker's proficiency level (CEFR) based on the analysis.
+
+4. Determine if the speaker's response actually answers the question that was asked
+
+5. Provide your assessment in the following format:
+   
+   **Lower bound for proficiency level (CEFR):**[A1(beginner)/A2(elementary)/B1(intermediate)/B2(upper intermediate)/C1(advanced)/C2(mastery)]
+
+   **Upper bound for proficiency level (CEFR):**[A1(beginner)/A2(elementary)/B1(intermediate)/B2(upper intermediate)/C1(advanced)/C2(mastery)]
+   
+   **Detailed Analysis:**
+   - Pronunciation: [Your assessment]
+   - Grammar: [Your assessment]
+   - Vocabulary: [Your assessment]
+   - Fluency: [Your assessment]
+   - Content Relevance: [Your assessment]
+
+Be specific, constructive, concise and objective in your assessment.
+"""
+
+ANALYSIS_PROMPT_TEMPLATE = """
+Please analyze the {target_language} audio response to the following question:
+
+**Question:** {question}
+
+**Target Language:** {target_language}
+
+Listen to the audio carefully and provide a comprehensive assessment of the speaker's {target_language} language proficiency and whether they adequately answered the question.
+"""
+
+# Placeholder substituted for the question while pre-rendering; cannot occur in a format string
+_QUESTION_MARKER = "\x00"
+
+
+def compute_prompt_version(*templates: str) -> str:
+    """
+    Derive a version identifier from the content of the prompt templates.
+
+    Args:
+        templates: Template strings that make up the prompt
+
+    Returns:
+        First 12 hex characters of the SHA-256 of the templates
+    """
+    digest = hashlib.sha256("\x00".join(templates).encode("utf-8")).hexdigest()
+    return digest[:12]
+
+
+@dataclass(frozen=True)
+class RenderedPrompts:
+    """Prompts for one language, rendered once from the registry's templates."""
+    language: str
+    version: str
+    system_prompt: str
+    # System prompt and the analysis text before the question, joined as
+    # GeminiAdapter.generate_with_audio would
+    audio_prefix: str
+    # Analysis text after the question
+    analysis_suffix: str
+
+    def audio_prompt(self, question: str) -> str:
+        """Build the full per-request audio prompt, system prompt included, for a question."""
+        return self.audio_prefix + question + self.analysis_suffix
+
+
+class PromptRegistry:
+    def __init__(
+        self,
+        languages: List[str],
+        system_template: str = SYSTEM_PROMPT_TEMPLATE,
+        analysis_template: str = ANALYSIS_PROMPT_TEMPLATE,
+    ):
+        """Render the prompt templates for every language up front.
+
+        The version is a content hash of the templates, so any wording change
+        produces a new version. Cache keys, metrics and stored results should
+        include it so that results from different prompts are never mixed.
+
+        Args:
+            languages: Languages to render prompts for
+            system_template: System prompt template with a {language} field
+            analysis_template: Analysis prompt template with {target_language}
+                and a single {question} field
+        """
+        if analysis_template.count("{question}") != 1:
+            raise ValueError("analysis_template must contain exactly one {question} field")
+
+        self.version = compute_prompt_version(system_template, analysis_template)
+        self._prompts: Dict[str, RenderedPrompts] = {}
+
+        for language in languages:
+            analysis = analysis_template.format(target_language=language, question=_QUESTION_MARKER)
+            prefix, _, suffix = analysis.partition(_QUESTION_MARKER)
+            system_prompt = system_template.format(language=language)
+            self._prompts[language] = RenderedPrompts(
+                language=language,
+                version=self.version,
+                system_prompt=system_prompt,
+                audio_prefix=f"{system_prompt}\n\n{prefix}",
+                analysis_suffix=suffix,
+            )
+
+    def __contains__(self, language: str) -> bool:
+        return language in self._prompts
+
+    @property
+    def languages(self) -> List[str]:
+        """Languages with rendered prompts."""
+        return list(self._prompts)
+
+    def get(self, language: str) -> RenderedPrompts:
+        """
+        Get the rendered prompts for a language.
+
+        Args:
+            language: Target language
+
+        Returns:
+            RenderedPrompts for the language
+
+        Raises:
+            ValueError: If the language was not rendered by this registry
+        """
+        try:
+            return self._prompts[language]
+        except KeyError:
+            raise ValueError(f"Unsupported language: {language}") from None
@@ -0,0 +1,273 @@
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional, Tuple
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of queued (the equivalent of HTTP 429)."""
+
+    def __init__(self, client_id: str, reason: str):
+        super().__init__(f"Request from {client_id} rejected: {reason}")
+        self.client_id = client_id
+        self.reason = reason
+
+
+class _Waiter:
+    __slots__ = ("client_id", "start_tag", "finish_tag", "previous_finish_tag", "enqueued_at", "admitted")
+
+    def __init__(self, client_id: str, start_tag: float, finish_tag: float, previous_finish_tag: float):
+        self.client_id = client_id
+        self.start_tag = start_tag
+        self.finish_tag = finish_tag
+        self.previous_finish_tag = previous_finish_tag
+        self.enqueued_at = time.monotonic()
+        self.admitted = threading.Event()
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrency: int,
+        per_client_concurrency: int,
+        max_queue_depth: int,
+        max_client_queue_depth: Optional[int] = None,
+        max_queue_wait: Optional[float] = None,
+        client_weights: Optional[Dict[str, float]] = None,
+        default_weight: float = 1.0,
+        wait_window: int = 1000,
+        max_tracked_clients: int = 10_000,
+    ):
+        """
+        Bound concurrent work and share it fairly between clients.
+
+        Requests beyond max_concurrency wait in per-client FIFO queues. Free
+        slots go to the waiting client whose head request has the smallest
+        virtual finish tag (weighted fair queuing; virtual time advances to the
+        start tag of each dispatched request), so each client gets a share of
+        throughput proportional to its weight no matter how many requests it
+        submits.
+        When the queue is full, new requests are rejected immediately instead
+        of waiting.
+
+        Args:
+            max_concurrency: Maximum number of requests running at once
+            per_client_concurrency: Maximum number of running requests per client
+            max_queue_depth: Maximum number of waiting requests across all clients
+            max_client_queue_depth: Optional maximum number of waiting requests per client
+            max_queue_wait: Optional maximum time in seconds a request may wait before it is rejected
+            client_weights: Optional mapping of client ID to fair-share weight
+            default_weight: Weight for clients not in client_weights
+            wait_window: Number of most recent queue wait times kept for metrics
+            max_tracked_clients: Maximum number of idle clients whose fair-queuing
+                state is remembered; the least recently active are forgotten first
+        """
+        self.max_concurrency = max_concurrency
+        self.per_client_concurrency = per_client_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.max_client_queue_depth = max_client_queue_depth
+        self.max_queue_wait = max_queue_wait
+        self.client_weights = client_weights or {}
+        self.default_weight = default_weight
+        self.max_tracked_clients = max_tracked_clients
+
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[_Waiter]] = {}
+        self._running: Dict[str, int] = {}
+        self._last_finish_tag: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._n_running = 0
+        self._n_queued = 0
+
+        self._n_admitted = 0
+        self._n_shed = 0
+        self._n_timed_out = 0
+        self._queue_waits: Deque[float] = deque(maxlen=wait_window)
+
+    @contextmanager
+    def admit(self, client_id: str) -> Iterator[float]:
+        """
+        Run the body of the with-block once the request is admitted.
+
+        Args:
+            client_id: Identifier of the client (tenant or API key) making the request
+
+        Yields:
+            Time in seconds the request spent waiting in the queue
+
+        Raises:
+            AdmissionRejected: If the queue is full or the request waited longer than max_queue_wait
+        """
+        queue_wait = self._acquire(client_id)
+        try:
+            yield queue_wait
+        finally:
+            self._release(client_id)
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        Snapshot of queue state and recent queue wait times.
+
+        Returns:
+            Dictionary with running/queued counts, admitted/rejected totals
+            (rejected = shed immediately + timed out in the queue) and p50/p95/max
+            queue wait in seconds over the most recent requests. Waits include
+            requests that timed out, since those users waited max_queue_wait too.
+        """
+        with self._lock:
+            waits = sorted(self._queue_waits)
+            snapshot = {
+                "running": self._n_running,
+                "queued": self._n_queued,
+                "admitted_total": self._n_admitted,
+                "rejected_total": self._n_shed + self._n_timed_out,
+                "shed_total": self._n_shed,
+                "timed_out_total": self._n_timed_out,
+            }
+
+        def percentile(q: float) -> float:
+            return waits[min(len(waits) - 1, int(q * len(waits)))] if waits else 0.0
+
+        snapshot["queue_wait_p50_seconds"] = percentile(0.50)
+        snapshot["queue_wait_p95_seconds"] = percentile(0.95)
+        snapshot["queue_wait_max_seconds"] = waits[-1] if waits else 0.0
+        return snapshot
+
+    def _acquire(self, client_id: str) -> float:
+        with self._lock:
+            waiter = _Waiter(client_id, *self._next_tags(client_id))
+            queue = self._queues.setdefault(client_id, deque())
+            queue.append(waiter)
+            self._n_queued += 1
+            self._dispatch_locked()
+
+            if waiter.admitted.is_set():
+                self._set_finish_tag_locked(client_id, waiter.finish_tag)
+                self._n_admitted += 1
+                self._queue_waits.append(0.0)
+                return 0.0
+
+            # Shed load up front rather than letting the request time out in the queue
+            reason = None
+            if self._n_queued > self.max_queue_depth:
+                reason = "server queue is full"
+            elif self.max_client_queue_depth is not None and len(queue) > self.max_client_queue_depth:
+                reason = "too many pending requests for this client"
+            if reason:
+                queue.pop()
+                self._n_queued -= 1
+                self._n_shed += 1
+                self._forget_idle_clients_locked()
+                logger.warning(f"Shedding request from {client_id}: {reason}")
+                raise AdmissionRejected(client_id, reason)
+
+            self._set_finish_tag_locked(client_id, waiter.finish_tag)
+
+        admitted = waiter.admitted.wait(self.max_queue_wait)
+
+        with self._lock:
+            queue_wait = time.monotonic() - waiter.enqueued_at
+            # Re-check under the lock: we may have been admitted right as the wait timed out
+            self._queue_waits.append(queue_wait)
+            if not admitted and not waiter.admitted.is_set():
+                self._remove_timed_out_locked(queue, waiter)
+                self._n_timed_out += 1
+                self._forget_idle_clients_locked()
+                logger.warning(f"Request from {client_id} timed out after {queue_wait:.1f}s in queue")
+                raise AdmissionRejected(client_id, f"waited {queue_wait:.1f}s in queue")
+            self._n_admitted += 1
+            return queue_wait
+
+    def _release(self, client_id: str) -> None:
+        with self._lock:
+            self._n_running -= 1
+            self._running[client_id] -= 1
+            if self._running[client_id] == 0:
+                del self._running[client_id]
+            self._dispatch_locked()
+
+    def _next_tags(self, client_id: str) -> Tuple[float, float, float]:
+        """
+        Start and finish tags for a new request, plus the client's previous finish tag.
+
+        A client's requests are spaced 1 / weight apart in virtual time.
+        """
+        weight = self.client_weights.get(client_id, self.default_weight)
+        previous_finish_tag = self._last_finish_tag.get(client_id, 0.0)
+        start_tag = max(self._virtual_time, previous_finish_tag)
+        return start_tag, start_tag + 1.0 / weight, previous_finish_tag
+
+    def _remove_timed_out_locked(self, queue: Deque[_Waiter], waiter: _Waiter) -> None:
+        """
+        Remove a waiter that timed out and give back the virtual time it reserved.
+
+        The client's later queued requests move up by the removed request's
+        cost, so the client does not lose priority for work that never ran.
+        """
+        index = queue.index(waiter)
+        del queue[index]
+        self._n_queued -= 1
+
+        cost = waiter.finish_tag - waiter.start_tag
+        for later in list(queue)[index:]:
+            later.start_tag -= cost
+            later.finish_tag -= cost
+            later.previous_finish_tag -= cost
+
+        if len(queue) > index:
+            self._set_finish_tag_locked(waiter.client_id, queue[-1].finish_tag)
+        else:
+            self._set_finish_tag_locked(waiter.client_id, waiter.previous_finish_tag)
+
+    def _set_finish_tag_locked(self, client_id: str, finish_tag: float) -> None:
+        # Re-insert so the dict stays ordered from least to most recently active client
+        self._last_finish_tag.pop(client_id, None)
+        self._last_finish_tag[client_id] = finish_tag
+
+    def _dispatch_locked(self) -> None:
+        """Hand free slots to eligible waiting clients in order of their head request's finish tag."""
+        while self._n_running < self.max_concurrency and self._n_queued > 0:
+            eligible = [
+                queue[0] for client_id, queue in self._queues.items()
+                if queue and self._running.get(client_id, 0) < self.per_client_concurrency
+            ]
+            if not eligible:
+                break
+
+            waiter = min(eligible, key=lambda w: w.finish_tag)
+            self._queues[waiter.client_id].popleft()
+            self._n_queued -= 1
+            self._n_running += 1
+            self._running[waiter.client_id] = self._running.get(waiter.client_id, 0) + 1
+            self._virtual_time = max(self._virtual_time, waiter.start_tag)
+            waiter.admitted.set()
+
+        self._forget_idle_clients_locked()
+
+    def _forget_idle_clients_locked(self) -> None:
+        """
+        Drop state for clients with nothing queued or running, so memory does
+        not grow with every client (e.g. every host) ever seen.
+        """
+        if self._n_running == 0 and self._n_queued == 0:
+            # Nothing is in flight, so no tag needs to be compared against another: start over
+            self._queues.clear()
+            self._last_finish_tag.clear()
+            self._virtual_time = 0.0
+            return
+
+        for client_id in [c for c, q in self._queues.items() if not q and c not in self._running]:
+            del self._queues[client_id]
+
+        # Least recently active first. An idle client's tag only matters while it is
+        # ahead of virtual time; beyond max_tracked_clients the oldest are forgotten anyway.
+        idle = [c for c in self._last_finish_tag if c not in self._running and c not in self._queues]
+        overflow = len(self._last_finish_tag) - self.max_tracked_clients
+        for client_id in idle:
+            if self._last_finish_tag[client_id] <= self._virtual_time or overflow > 0:
+                del self._last_finish_tag[client_id]
+                overflow -= 1
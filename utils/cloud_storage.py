@@ -1,7 +1,10 @@
-from google.cloud import storage
+from __future__ import annotations
 from typing import Optional, Union, BinaryIO
+from utils.lazy_import import lazy_import
 import os
 
+storage = lazy_import("google.cloud.storage")
+
 def get_storage_client() -> storage.Client:
     """
     Creates and returns a Google Cloud Storage client.
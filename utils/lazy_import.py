@@ -0,0 +1,45 @@
+from types import ModuleType
+import importlib
+import sys
+
+
+class LazyModule(ModuleType):
+    """Module placeholder that imports the real module on first attribute access."""
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self.__name__)
+        # Copy the real module's namespace so later lookups are plain attribute
+        # hits and no longer go through __getattr__
+        self.__dict__.update(
+            (name, value) for name, value in vars(module).items() if name not in ("__name__", "__spec__", "__loader__")
+        )
+        return getattr(module, attr)
+
+    def __dir__(self):
+        return dir(importlib.import_module(self.__name__))
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Defer importing a module until one of its attributes is used.
+
+    Heavy SDKs (gradio, google-generativeai, google-cloud-*, pandas, openai)
+    take hundreds of milliseconds to import. Binding them with lazy_import at
+    module level keeps the usual `module.attr` call sites while only paying
+    the import cost in processes that actually use them.
+
+    Modules using this for names referenced in annotations should start with
+    `from __future__ import annotations` so the annotations are not evaluated
+    at import time.
+
+    Args:
+        name: Fully qualified module name, e.g. "google.cloud.bigquery"
+
+    Returns:
+        The module itself if it is already imported, otherwise a placeholder
+        that imports it on first use
+
+    Raises:
+        ModuleNotFoundError: On first use, if the module is not installed
+    """
+    return sys.modules.get(name) or LazyModule(name)